@@ -0,0 +1,209 @@
+import mmap
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from scipy import signal
+
+# Fatores de multiplicação por eixo para vibração de corpo inteiro (ISO 2631-1 e NHO 09)
+FATORES_EIXO = (1.4, 1.4, 1.0)
+
+# Jornada de referência para normalização da aceleração (8 horas, em segundos)
+JORNADA_REFERENCIA = 8 * 3600.0
+
+# Número de amostras (por eixo) processadas a cada bloco
+TAMANHO_BLOCO = 1 << 20
+
+# Parâmetros das ponderações em frequência da ISO 2631-1 (Anexo A)
+# f1/f2: limitação de banda; f3/f4/Q4: transição aceleração-velocidade;
+# f5/Q5/f6/Q6: degrau ascendente (somente Wk)
+PONDERACOES = {
+    'Wd': {'f1': 0.4, 'f2': 100.0, 'f3': 2.0, 'f4': 2.0, 'Q4': 0.63},
+    'Wk': {'f1': 0.4, 'f2': 100.0, 'f3': 12.5, 'f4': 12.5, 'Q4': 0.63,
+           'f5': 2.37, 'Q5': 0.91, 'f6': 3.35, 'Q6': 0.91},
+}
+
+# Ponderação aplicada a cada eixo (x, y, z)
+PONDERACAO_EIXO = ('Wd', 'Wd', 'Wk')
+
+
+def _polinomios_ponderacao(nome: str) -> List[Tuple[list, list]]:
+    """Retorna os pares (numerador, denominador) analógicos de cada estágio da ponderação."""
+    p = PONDERACOES[nome]
+    w1, w2, w3, w4 = (2 * np.pi * p[f] for f in ('f1', 'f2', 'f3', 'f4'))
+    q1 = 1 / np.sqrt(2)
+
+    estagios = [
+        ([1.0, 0.0, 0.0], [1.0, w1 / q1, w1 ** 2]),           # passa-altas
+        ([w2 ** 2], [1.0, w2 / q1, w2 ** 2]),                 # passa-baixas
+        ([w4 ** 2 / w3, w4 ** 2], [1.0, w4 / p['Q4'], w4 ** 2]),  # transição a-v
+    ]
+    if 'f5' in p:
+        w5, w6 = 2 * np.pi * p['f5'], 2 * np.pi * p['f6']
+        estagios.append(([1.0, w5 / p['Q5'], w5 ** 2], [1.0, w6 / p['Q6'], w6 ** 2]))
+    return estagios
+
+
+def filtro_ponderacao(nome: str, taxa_amostragem: float) -> np.ndarray:
+    """
+    Monta o filtro digital (seções de segunda ordem) da ponderação em frequência.
+
+    Args:
+        nome: Ponderação da ISO 2631-1 ('Wd' ou 'Wk')
+        taxa_amostragem: Taxa de amostragem do sinal em Hz
+
+    Returns:
+        np.ndarray: Matriz SOS utilizável por scipy.signal.sosfilt
+    """
+    if nome not in PONDERACOES:
+        raise ValueError(f"Ponderação desconhecida: {nome}")
+    if taxa_amostragem <= 2 * PONDERACOES[nome]['f2']:
+        raise ValueError("Taxa de amostragem insuficiente para a ponderação (mínimo de 200 Hz)")
+
+    zeros, polos, ganho = [], [], 1.0
+    for num, den in _polinomios_ponderacao(nome):
+        z, p, k = signal.tf2zpk(num, den)
+        zeros.extend(z)
+        polos.extend(p)
+        ganho *= k
+
+    zd, pd, kd = signal.bilinear_zpk(np.array(zeros), np.array(polos), ganho, taxa_amostragem)
+    return signal.zpk2sos(zd, pd, kd)
+
+
+def _blocos_binario(caminho: str, dtype: str, colunas: Sequence[int], n_colunas: int,
+                    offset: int) -> Iterator[np.ndarray]:
+    """Lê um arquivo binário de amostras intercaladas em blocos, via memória mapeada."""
+    dados = np.memmap(caminho, dtype=np.dtype(dtype), mode='r', offset=offset)
+    n_amostras = dados.size // n_colunas
+    dados = dados[:n_amostras * n_colunas].reshape(n_amostras, n_colunas)
+    for inicio in range(0, n_amostras, TAMANHO_BLOCO):
+        yield np.asarray(dados[inicio:inicio + TAMANHO_BLOCO, colunas], dtype=np.float64)
+
+
+def _linha_numerica(linha: bytes, sep: bytes, dec: bytes) -> bool:
+    """Indica se todos os campos da linha podem ser convertidos em número."""
+    try:
+        for campo in linha.split(sep):
+            float(campo.replace(dec, b'.'))
+    except ValueError:
+        return False
+    return True
+
+
+def _blocos_csv(caminho: str, colunas: Sequence[int], separador: str,
+                decimal: str) -> Iterator[np.ndarray]:
+    """Lê um arquivo CSV em blocos alinhados a quebras de linha, via memória mapeada."""
+    sep, dec = separador.encode(), decimal.encode()
+    if sep == dec:
+        raise ValueError("Separador de colunas e separador decimal devem ser diferentes")
+
+    with open(caminho, 'rb') as arquivo, \
+            mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        tamanho = len(mapa)
+        posicao = 0
+
+        # Ignora o cabeçalho, se a primeira linha não for numérica
+        fim_linha = mapa.find(b'\n')
+        primeira = mapa[:fim_linha if fim_linha >= 0 else tamanho]
+        if not _linha_numerica(primeira, sep, dec):
+            posicao = fim_linha + 1 if fim_linha >= 0 else tamanho
+            fim_linha = mapa.find(b'\n', posicao)
+            primeira = mapa[posicao:fim_linha if fim_linha >= 0 else tamanho]
+        n_colunas = primeira.count(sep) + 1
+
+        bytes_bloco = TAMANHO_BLOCO * n_colunas * 12
+        while posicao < tamanho:
+            fim = min(posicao + bytes_bloco, tamanho)
+            if fim < tamanho:
+                fim = mapa.rfind(b'\n', posicao, fim) + 1 or tamanho
+            trecho = mapa[posicao:fim].replace(sep, b' ')
+            if dec != b'.':
+                trecho = trecho.replace(dec, b'.')
+            valores = np.fromstring(trecho, sep=' ')
+            if valores.size % n_colunas:
+                raise ValueError("Arquivo CSV com número irregular de colunas")
+            yield valores.reshape(-1, n_colunas)[:, colunas]
+            posicao = fim
+
+
+def calcular_metricas(caminho: str, taxa_amostragem: float, tempo_exposicao: float,
+                      formato: str = 'csv', colunas: Sequence[int] = (0, 1, 2),
+                      dtype: str = '<f4', n_colunas: int = 3, offset: int = 0,
+                      separador: str = ',', decimal: str = '.') -> Dict:
+    """
+    Calcula aren e VDVR a partir de um registro triaxial de acelerômetro.
+
+    O sinal é lido em blocos, ponderado em frequência (Wd para x e y, Wk para z)
+    com estado do filtro preservado entre blocos, e as somas de a² e a⁴ de cada
+    eixo são acumuladas para o cálculo final.
+
+    Args:
+        caminho: Caminho do arquivo de aceleração (m/s²)
+        taxa_amostragem: Taxa de amostragem do registro em Hz
+        tempo_exposicao: Tempo de exposição diário efetivo em horas (NHO 09)
+        formato: 'csv' ou 'binario' (amostras intercaladas)
+        colunas: Índices das colunas correspondentes aos eixos x, y e z
+        dtype: Tipo numérico das amostras no formato binário
+        n_colunas: Número de canais intercalados no formato binário
+        offset: Bytes de cabeçalho a ignorar no formato binário
+        separador: Separador de colunas no formato CSV
+        decimal: Separador decimal no formato CSV
+
+    Returns:
+        Dict: {'ms2': aren, 'ms175': VDVR, 'detalhes': valores por eixo}
+    """
+    if not tempo_exposicao or tempo_exposicao <= 0:
+        raise ValueError("Tempo de exposição diário deve ser informado e maior que zero")
+
+    colunas = list(colunas)
+    if len(colunas) != 3:
+        raise ValueError("Devem ser informadas exatamente três colunas (x, y, z)")
+
+    if formato == 'csv':
+        blocos = _blocos_csv(caminho, colunas, separador, decimal)
+    elif formato == 'binario':
+        blocos = _blocos_binario(caminho, dtype, colunas, n_colunas, offset)
+    else:
+        raise ValueError(f"Formato de arquivo inválido: {formato}")
+
+    filtros = {nome: filtro_ponderacao(nome, taxa_amostragem) for nome in set(PONDERACAO_EIXO)}
+    estados = [np.zeros((filtros[nome].shape[0], 2)) for nome in PONDERACAO_EIXO]
+    soma2 = np.zeros(3)
+    soma4 = np.zeros(3)
+    n_amostras = 0
+
+    for bloco in blocos:
+        for eixo, nome in enumerate(PONDERACAO_EIXO):
+            ponderado, estados[eixo] = signal.sosfilt(
+                filtros[nome], bloco[:, eixo], zi=estados[eixo]
+            )
+            quadrado = ponderado * ponderado
+            soma2[eixo] += quadrado.sum()
+            soma4[eixo] += np.dot(quadrado, quadrado)
+        n_amostras += bloco.shape[0]
+
+    if n_amostras == 0:
+        raise ValueError("Arquivo de aceleração sem amostras")
+
+    duracao = n_amostras / taxa_amostragem
+    exposicao = tempo_exposicao * 3600.0
+    fatores = np.array(FATORES_EIXO)
+
+    # Aceleração média por eixo e aceleração resultante de exposição normalizada
+    amj = fatores * np.sqrt(soma2 / n_amostras)
+    aren = float(amj.max() * np.sqrt(exposicao / JORNADA_REFERENCIA))
+
+    # Dose de vibração por eixo, extrapolada para o tempo de exposição diário
+    vdvj = fatores * (soma4 / taxa_amostragem) ** 0.25
+    vdvr = float(vdvj.max() * (exposicao / duracao) ** 0.25)
+
+    return {
+        'ms2': round(aren, 4),
+        'ms175': round(vdvr, 4),
+        'detalhes': {
+            'duracao_registro': duracao,
+            'tempo_exposicao': exposicao,
+            'amj': [float(v) for v in amj],
+            'vdvj': [float(v) for v in vdvj],
+        },
+    }
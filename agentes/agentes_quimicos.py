@@ -1,19 +1,383 @@
+import unicodedata
 from datetime import datetime
-from typing import List
+from typing import List, Dict, Optional, Sequence
 
-def avaliar_periodo(data_inicio: datetime, data_fim: datetime, agentes: List[str], intensidade: float) -> bool:
+import numpy as np
+
+from .utils import fragmentar_periodo, formatar_resultado, obter_regime
+
+# Datas de corte para agentes químicos
+DATAS_CORTE = [
+    datetime(1997, 3, 6),   # Remissão aos limites de tolerância da NR-15 (Decreto nº 2.172/1997)
+    datetime(2014, 10, 8),  # LINACH: cancerígenos do Grupo 1 avaliados qualitativamente
+]
+
+FUNDAMENTOS = {
+    'decretos': "Anexo do Decreto Federal nº 53.831/1964 e Anexo I do Decreto Federal nº 83.080/1979",
+    'anexo_11': "Anexo 11 da NR-15, por remissão do Anexo IV dos Decretos Federais nº 2.172/1997 e nº 3.048/1999",
+    'anexo_13': "Anexo 13 da NR-15, por remissão do Anexo IV dos Decretos Federais nº 2.172/1997 e nº 3.048/1999",
+    'linach': "art. 68, § 4º, do Decreto Federal nº 3.048/1999 e Portaria Interministerial MTE/MS/MPS nº 9/2014 (LINACH, Grupo 1)",
+}
+
+UNIDADES = {
+    'ppm': 'ppm',
+    'mg/m3': 'mg/m3',
+    'mg/m³': 'mg/m3',
+    'mgm3': 'mg/m3',
+}
+
+# Substâncias do catálogo: limites de tolerância do Anexo 11 da NR-15 (até 48 h/semana,
+# 'teto' para os marcados como valor teto), substâncias de avaliação qualitativa
+# (Anexo 13) e cancerígenos do Grupo 1 da LINACH. O catálogo reúne apenas parte
+# das substâncias dos anexos; as demais são tratadas como não catalogadas
+SUBSTANCIAS = [
+    {'nome': 'Acetato de etila', 'cas': '141-78-6', 'sinonimos': ['acetato de etilo'],
+     'anexo': 11, 'ppm': 310.0, 'mg/m3': 1090.0},
+    {'nome': 'Acetona', 'cas': '67-64-1', 'sinonimos': ['propanona', 'dimetilcetona'],
+     'anexo': 11, 'ppm': 780.0, 'mg/m3': 1870.0},
+    {'nome': 'Ácido clorídrico', 'cas': '7647-01-0', 'sinonimos': ['cloreto de hidrogênio'],
+     'anexo': 11, 'ppm': 4.0, 'mg/m3': 5.5, 'teto': True},
+    {'nome': 'Ácido sulfídrico', 'cas': '7783-06-4', 'sinonimos': ['sulfeto de hidrogênio', 'gás sulfídrico'],
+     'anexo': 11, 'ppm': 8.0, 'mg/m3': 12.0},
+    {'nome': 'Álcool etílico', 'cas': '64-17-5', 'sinonimos': ['etanol'],
+     'anexo': 11, 'ppm': 780.0, 'mg/m3': 1480.0},
+    {'nome': 'Álcool metílico', 'cas': '67-56-1', 'sinonimos': ['metanol'],
+     'anexo': 11, 'ppm': 156.0, 'mg/m3': 200.0},
+    {'nome': 'Amônia', 'cas': '7664-41-7', 'sinonimos': ['amoníaco'],
+     'anexo': 11, 'ppm': 20.0, 'mg/m3': 14.0},
+    {'nome': 'Butanona', 'cas': '78-93-3', 'sinonimos': ['metil etil cetona', 'mek'],
+     'anexo': 11, 'ppm': 155.0, 'mg/m3': 460.0},
+    {'nome': 'Cloreto de vinila', 'cas': '75-01-4', 'sinonimos': ['cloroeteno', 'mvc'],
+     'anexo': 11, 'ppm': 156.0, 'mg/m3': 398.0, 'cancerigeno': True},
+    {'nome': 'Cloro', 'cas': '7782-50-5', 'sinonimos': [],
+     'anexo': 11, 'ppm': 0.8, 'mg/m3': 2.3},
+    {'nome': 'Dióxido de carbono', 'cas': '124-38-9', 'sinonimos': ['gás carbônico'],
+     'anexo': 11, 'ppm': 3900.0, 'mg/m3': 7020.0},
+    {'nome': 'Dióxido de enxofre', 'cas': '7446-09-5', 'sinonimos': ['anidrido sulfuroso'],
+     'anexo': 11, 'ppm': 4.0, 'mg/m3': 10.0},
+    {'nome': 'Dióxido de nitrogênio', 'cas': '10102-44-0', 'sinonimos': [],
+     'anexo': 11, 'ppm': 4.0, 'mg/m3': 7.0, 'teto': True},
+    {'nome': 'Estireno', 'cas': '100-42-5', 'sinonimos': ['estireno monômero', 'vinilbenzeno'],
+     'anexo': 11, 'ppm': 78.0, 'mg/m3': 328.0},
+    {'nome': 'Fenol', 'cas': '108-95-2', 'sinonimos': ['ácido fênico'],
+     'anexo': 11, 'ppm': 4.0, 'mg/m3': 15.0},
+    {'nome': 'Formaldeído', 'cas': '50-00-0', 'sinonimos': ['aldeído fórmico', 'formol'],
+     'anexo': 11, 'ppm': 1.6, 'mg/m3': 2.3, 'teto': True, 'cancerigeno': True},
+    {'nome': 'n-Hexano', 'cas': '110-54-3', 'sinonimos': ['hexano'],
+     'anexo': 11, 'ppm': 50.0, 'mg/m3': 176.0},
+    {'nome': 'Mercúrio', 'cas': '7439-97-6', 'sinonimos': ['mercúrio metálico'],
+     'anexo': 11, 'ppm': None, 'mg/m3': 0.04},
+    {'nome': 'Monóxido de carbono', 'cas': '630-08-0', 'sinonimos': [],
+     'anexo': 11, 'ppm': 39.0, 'mg/m3': 43.0},
+    {'nome': 'Tolueno', 'cas': '108-88-3', 'sinonimos': ['toluol', 'metilbenzeno'],
+     'anexo': 11, 'ppm': 78.0, 'mg/m3': 290.0},
+    {'nome': 'Tricloroetileno', 'cas': '79-01-6', 'sinonimos': ['tricloroeteno'],
+     'anexo': 11, 'ppm': 78.0, 'mg/m3': 420.0, 'cancerigeno': True},
+    {'nome': 'Xileno', 'cas': '1330-20-7', 'sinonimos': ['xilol', 'dimetilbenzeno'],
+     'anexo': 11, 'ppm': 78.0, 'mg/m3': 340.0},
+    {'nome': 'Arsênio', 'cas': '7440-38-2', 'sinonimos': ['arsênico'],
+     'anexo': 13, 'cancerigeno': True},
+    {'nome': 'Benzeno', 'cas': '71-43-2', 'sinonimos': ['benzol'],
+     'anexo': 13, 'cancerigeno': True},
+    {'nome': 'Chumbo', 'cas': '7439-92-1', 'sinonimos': ['chumbo inorgânico'],
+     'anexo': 13},
+    {'nome': 'Hidrocarbonetos aromáticos policíclicos', 'cas': None,
+     'sinonimos': ['hpa', 'alcatrão', 'breu', 'piche'], 'anexo': 13, 'cancerigeno': True},
+    {'nome': 'Óleos minerais', 'cas': None,
+     'sinonimos': ['óleo mineral', 'graxa', 'óleos minerais não tratados'], 'anexo': 13, 'cancerigeno': True},
+]
+
+
+def normalizar_chave(texto: str) -> str:
+    """Normaliza nome, sinônimo ou CAS para busca no catálogo (sem acentos e caixa)."""
+    texto = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode()
+    return ' '.join(texto.lower().replace('-', ' ').split())
+
+
+def fator_desvio(limite: float) -> float:
+    """Retorna o fator de desvio do Quadro 1 do Anexo 11 da NR-15 para o limite informado."""
+    if limite <= 1:
+        return 3.0
+    elif limite <= 10:
+        return 2.0
+    elif limite <= 100:
+        return 1.5
+    elif limite <= 1000:
+        return 1.25
+    return 1.1
+
+
+def _construir_catalogo(substancias: List[Dict]) -> Dict:
+    """Monta o índice de busca e as tabelas de limites e critérios por substância."""
+    indice = {}
+    for i, substancia in enumerate(substancias):
+        for chave in [substancia['nome'], substancia.get('cas')] + substancia['sinonimos']:
+            if chave:
+                indice[normalizar_chave(chave)] = i
+
+    limites = {
+        unidade: np.array([s.get(unidade) or np.nan for s in substancias])
+        for unidade in ('ppm', 'mg/m3')
+    }
+    anexo_11 = np.array([s['anexo'] == 11 for s in substancias])
+    cancerigeno = np.array([s.get('cancerigeno', False) for s in substancias])
+    teto = np.array([s.get('teto', False) for s in substancias])
+
+    # Critério qualitativo por regime (linhas) e substância (colunas)
+    qualitativo = np.vstack([
+        np.ones(len(substancias), dtype=bool),
+        ~anexo_11,
+        ~anexo_11 | cancerigeno,
+    ])
+
+    return {
+        'substancias': substancias,
+        'indice': indice,
+        'limites': limites,
+        'fator_desvio': {
+            unidade: np.array([fator_desvio(v) if v == v else np.nan for v in valores])
+            for unidade, valores in limites.items()
+        },
+        'qualitativo': qualitativo,
+        'anexo_11': anexo_11,
+        'teto': teto,
+        'cancerigeno': cancerigeno,
+    }
+
+
+CATALOGO = _construir_catalogo(SUBSTANCIAS)
+
+
+def buscar_substancia(chave: str) -> Optional[int]:
+    """Retorna o índice da substância no catálogo pelo nome, CAS ou sinônimo."""
+    return CATALOGO['indice'].get(normalizar_chave(chave))
+
+
+def _fundamento(regime: int, indice: int) -> str:
+    """Retorna o fundamento legal aplicável à substância no regime."""
+    if regime == 0:
+        return FUNDAMENTOS['decretos']
+    if regime == 2 and CATALOGO['cancerigeno'][indice]:
+        return FUNDAMENTOS['linach']
+    return FUNDAMENTOS['anexo_11' if CATALOGO['anexo_11'][indice] else 'anexo_13']
+
+
+def calcular_twa(amostras: Sequence[Dict]) -> Dict:
+    """
+    Calcula a média ponderada no tempo de cada substância amostrada.
+
+    Cada amostra é um dicionário com 'substancia' (nome, CAS ou sinônimo),
+    'concentracao', 'unidade' ('ppm' ou 'mg/m3', padrão 'ppm') e 'duracao'
+    (minutos, padrão 1). As concentrações são expressas como fração do limite
+    de tolerância na unidade informada, o que permite combinar amostras de
+    todas as substâncias em uma única passagem.
+
+    Args:
+        amostras: Lista de amostras de concentração
+
+    Returns:
+        Dict: Arrays 'indices', 'twa', 'unidade', 'dose' e 'excede_valor_maximo'
+        (valor máximo ou, para substâncias com valor teto, o próprio limite),
+        um elemento por substância
+    """
+    n = len(amostras)
+    indices = np.empty(n, dtype=np.int64)
+    concentracao = np.empty(n)
+    duracao = np.empty(n)
+    unidade_ppm = np.empty(n, dtype=bool)
+
+    for i, amostra in enumerate(amostras):
+        indice = buscar_substancia(amostra['substancia'])
+        if indice is None:
+            raise ValueError(f"Substância não encontrada no catálogo: {amostra['substancia']}")
+        unidade = UNIDADES.get(amostra.get('unidade', 'ppm'))
+        if unidade is None:
+            raise ValueError(f"Unidade de concentração inválida: {amostra.get('unidade')}")
+
+        indices[i] = indice
+        concentracao[i] = amostra['concentracao']
+        duracao[i] = amostra.get('duracao', 1.0)
+        unidade_ppm[i] = unidade == 'ppm'
+
+    if np.any(concentracao < 0) or np.any(duracao <= 0):
+        raise ValueError("Concentrações não podem ser negativas e durações devem ser maiores que zero")
+
+    limites = CATALOGO['limites']
+    limite = np.where(unidade_ppm, limites['ppm'][indices], limites['mg/m3'][indices])
+    desvio = np.where(unidade_ppm, CATALOGO['fator_desvio']['ppm'][indices],
+                      CATALOGO['fator_desvio']['mg/m3'][indices])
+
+    # Substâncias com valor teto não admitem nenhuma amostra acima do limite
+    desvio = np.where(CATALOGO['teto'][indices], 1.0, desvio)
+    quantitativo = ~np.isnan(limite)
+    sem_limite = CATALOGO['anexo_11'][indices] & ~quantitativo
+    if np.any(sem_limite):
+        substancia = CATALOGO['substancias'][indices[np.argmax(sem_limite)]]['nome']
+        raise ValueError(f"Substância sem limite de tolerância na unidade informada: {substancia}")
+    fracao = np.divide(concentracao, limite, out=np.zeros(n), where=quantitativo)
+
+    # Agrupamento por substância, preservando a ordem de primeira ocorrência
+    unicos, primeira, grupo = np.unique(indices, return_index=True, return_inverse=True)
+    ordem = np.argsort(primeira)
+    posicao = np.empty_like(ordem)
+    posicao[ordem] = np.arange(ordem.size)
+    grupo = posicao[grupo]
+
+    tempo = np.bincount(grupo, weights=duracao)
+    dose = np.bincount(grupo, weights=fracao * duracao) / tempo
+    excede = np.zeros(unicos.size, dtype=bool)
+    np.logical_or.at(excede, grupo, quantitativo & (fracao > desvio))
+
+    # TWA reportada na unidade da primeira amostra de cada substância
+    primeira = primeira[ordem]
+    twa = np.where(quantitativo[primeira], dose * limite[primeira],
+                   np.bincount(grupo, weights=concentracao * duracao) / tempo)
+
+    return {
+        'indices': unicos[ordem],
+        'twa': twa,
+        'unidade': np.where(unidade_ppm[primeira], 'ppm', 'mg/m3'),
+        'dose': dose,
+        'excede_valor_maximo': excede,
+    }
+
+
+def _medias_nao_catalogadas(amostras: Sequence[Dict]) -> List[Dict]:
+    """Calcula a média ponderada no tempo das substâncias ausentes do catálogo, na unidade informada."""
+    medias = {}
+    for amostra in amostras:
+        unidade = UNIDADES.get(amostra.get('unidade', 'ppm'))
+        if unidade is None:
+            raise ValueError(f"Unidade de concentração inválida: {amostra.get('unidade')}")
+        concentracao, duracao = float(amostra['concentracao']), float(amostra.get('duracao', 1.0))
+        if concentracao < 0 or duracao <= 0:
+            raise ValueError("Concentrações não podem ser negativas e durações devem ser maiores que zero")
+
+        media = medias.setdefault(normalizar_chave(amostra['substancia']), {
+            'nome': str(amostra['substancia']).strip(), 'unidade': unidade, 'soma': 0.0, 'tempo': 0.0,
+        })
+        if media['unidade'] != unidade:
+            raise ValueError(f"Unidades diferentes para a substância não catalogada: {media['nome']}")
+        media['soma'] += concentracao * duracao
+        media['tempo'] += duracao
+
+    return [
+        {'nome': media['nome'], 'unidade': media['unidade'], 'twa': media['soma'] / media['tempo']}
+        for media in medias.values()
+    ]
+
+
+def processar_amostras(data_inicio: datetime, data_fim: datetime, amostras: Sequence[Dict]) -> List[Dict]:
+    """
+    Processa um período com amostras de várias substâncias, fragmentando-o conforme as datas de corte.
+
+    Substâncias ausentes do catálogo não são enquadradas automaticamente: para
+    elas é retornado, em cada subperíodo, um resultado sem limite e com
+    critério 'nao_catalogado'.
+
+    Args:
+        data_inicio: Data de início do período
+        data_fim: Data de fim do período
+        amostras: Lista de amostras de concentração (ver calcular_twa)
+
+    Returns:
+        Lista de dicionários contendo informações de cada subperíodo e substância
+    """
+    catalogadas = [buscar_substancia(amostra['substancia']) is not None for amostra in amostras]
+    medias = calcular_twa([a for a, catalogada in zip(amostras, catalogadas) if catalogada])
+    nao_catalogadas = _medias_nao_catalogadas([a for a, catalogada in zip(amostras, catalogadas) if not catalogada])
+    indices = medias['indices']
+    subperiodos = fragmentar_periodo(data_inicio, data_fim, DATAS_CORTE)
+    resultados = []
+
+    for inicio_sub, fim_sub in subperiodos:
+        regime = obter_regime(inicio_sub, DATAS_CORTE)
+        qualitativo = CATALOGO['qualitativo'][regime, indices]
+        especial = qualitativo | (medias['dose'] > 1.0) | medias['excede_valor_maximo']
+
+        for j, indice in enumerate(indices):
+            substancia = CATALOGO['substancias'][indice]
+            unidade = str(medias['unidade'][j])
+            limite = None if qualitativo[j] else float(CATALOGO['limites'][unidade][indice])
+
+            resultados.append(formatar_resultado(
+                data_inicio=inicio_sub,
+                data_fim=fim_sub,
+                agente='agentes_quimicos',
+                intensidade=round(float(medias['twa'][j]), 4),
+                eh_especial=bool(especial[j]),
+                limite=limite,
+                unidade=unidade,
+                detalhes={
+                    'substancia': substancia['nome'],
+                    'cas': substancia.get('cas'),
+                    'criterio': 'qualitativo' if qualitativo[j] else 'quantitativo',
+                    'valor_teto': bool(CATALOGO['teto'][indice]),
+                    'excede_valor_maximo': bool(medias['excede_valor_maximo'][j]),
+                },
+                fundamento=_fundamento(regime, indice)
+            ))
+
+        for media in nao_catalogadas:
+            resultados.append(formatar_resultado(
+                data_inicio=inicio_sub,
+                data_fim=fim_sub,
+                agente='agentes_quimicos',
+                intensidade=round(media['twa'], 4),
+                eh_especial=False,
+                unidade=media['unidade'],
+                detalhes={
+                    'substancia': media['nome'],
+                    'cas': None,
+                    'criterio': 'nao_catalogado',
+                }
+            ))
+
+    return resultados
+
+
+def processar_periodo(data_inicio: datetime, data_fim: datetime, intensidade: float,
+                      substancia: str, unidade: str = 'ppm') -> List[Dict]:
+    """
+    Processa um período completo, fragmentando-o conforme as datas de corte.
+
+    Args:
+        data_inicio: Data de início do período
+        data_fim: Data de fim do período
+        intensidade: Concentração média ponderada no tempo
+        substancia: Nome, CAS ou sinônimo da substância
+        unidade: Unidade da concentração ('ppm' ou 'mg/m3')
+
+    Returns:
+        Lista de dicionários contendo informações de cada subperíodo
+    """
+    amostra = {'substancia': substancia, 'concentracao': intensidade, 'unidade': unidade}
+    return processar_amostras(data_inicio, data_fim, [amostra])
+
+
+def avaliar_periodo(data_inicio: datetime, data_fim: datetime, agentes: List[str], intensidade: float,
+                    unidade: str = 'ppm') -> bool:
     """
     Avalia se um período é especial para agentes químicos.
-    
+
+    Agentes ausentes do catálogo não tornam o período especial.
+
     Args:
         data_inicio: Data de início do período
         data_fim: Data de fim do período
         agentes: Lista de agentes químicos presentes
         intensidade: Concentração ou nível de exposição
-    
+        unidade: Unidade da concentração ('ppm' ou 'mg/m3')
+
     Returns:
         bool: True se o período é especial, False caso contrário
+
+    Raises:
+        ValueError: Se a unidade for inválida ou algum agente do Anexo 11 não
+            tiver limite de tolerância na unidade informada
     """
-    # Implementar lógica específica para cada agente químico
-    # Por enquanto, retorna True se houver qualquer exposição
-    return len(agentes) > 0
+    if not agentes:
+        return False
+
+    amostras = [{'substancia': agente, 'concentracao': intensidade, 'unidade': unidade} for agente in agentes]
+    return any(r['eh_especial'] for r in processar_amostras(data_inicio, data_fim, amostras))
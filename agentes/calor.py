@@ -1,16 +1,241 @@
 from datetime import datetime
+from typing import List, Dict, Sequence, Tuple
+
+import numpy as np
+
+from .utils import fragmentar_periodo, formatar_resultado, obter_regime
+
+# Datas de corte para o agente calor
+DATAS_CORTE = [
+    datetime(1997, 3, 6),    # Remissão aos limites de tolerância da NR-15 (Decreto nº 2.172/1997)
+    datetime(2019, 12, 11),  # Novo Anexo 3 da NR-15 (Portaria SEPRT nº 1.359/2019)
+]
+
+# Conversão de taxa metabólica de kcal/h para W
+KCAL_H_PARA_W = 1.163
+
+# Taxa metabólica adotada quando não informada (trabalho pesado, 500 kcal/h)
+METABOLISMO_PADRAO = 500 * KCAL_H_PARA_W
+
+# Quadro 2 do Anexo 3 da NR-15 (redação original): M (kcal/h) -> IBUTG máximo (°C)
+QUADRO_2_M = np.array([175.0, 200.0, 250.0, 300.0, 350.0, 400.0, 450.0, 500.0])
+QUADRO_2_IBUTG = np.array([30.5, 30.0, 28.5, 27.5, 26.5, 26.0, 25.5, 25.0])
+
+FUNDAMENTOS = [
+    "código 1.1.1, do Anexo do Decreto Federal nº 53.831/1964",
+    "Quadro 2 do Anexo 3 da NR-15 (redação original), por remissão do código 2.0.4, "
+    "do Anexo IV dos Decretos Federais nº 2.172/1997 e nº 3.048/1999",
+    "Anexo 3 da NR-15, com redação dada pela Portaria SEPRT nº 1.359/2019, por remissão do "
+    "código 2.0.4, do Anexo IV do Decreto Federal nº 3.048/1999",
+]
+
+
+def limite_ibutg(regime: int, metabolismo):
+    """
+    Retorna o IBUTG máximo admitido no regime para a taxa metabólica informada.
+
+    Args:
+        regime: Índice do regime normativo (ver utils.obter_regime)
+        metabolismo: Taxa metabólica em W (escalar ou array)
+
+    Returns:
+        Limite de IBUTG em °C, com o mesmo formato da taxa metabólica
+    """
+    metabolismo = np.asarray(metabolismo, dtype=np.float64)
+    if regime == 0:
+        return np.full(metabolismo.shape, 28.0)
+    elif regime == 1:
+        return np.round(np.interp(metabolismo / KCAL_H_PARA_W, QUADRO_2_M, QUADRO_2_IBUTG), 1)
+    return np.round(59.9 - 14.1 * np.log10(metabolismo), 1)
+
+
+def obter_limite_e_fundamento(data: datetime, metabolismo: float = METABOLISMO_PADRAO) -> tuple[float, str]:
+    """Retorna o limite de IBUTG e fundamento legal para a data e taxa metabólica especificadas."""
+    regime = obter_regime(data, DATAS_CORTE)
+    return float(limite_ibutg(regime, metabolismo)), FUNDAMENTOS[regime]
+
+
+def calcular_ibutg(tbn, tg, tbs=None):
+    """
+    Calcula o IBUTG instantâneo a partir das leituras dos termômetros.
+
+    Args:
+        tbn: Temperatura de bulbo úmido natural (°C)
+        tg: Temperatura de globo (°C)
+        tbs: Temperatura de bulbo seco (°C), apenas para ambientes com carga solar
+
+    Returns:
+        IBUTG em °C, com o mesmo formato das entradas
+    """
+    tbn = np.asarray(tbn, dtype=np.float64)
+    tg = np.asarray(tg, dtype=np.float64)
+    if tbs is None:
+        return 0.7 * tbn + 0.3 * tg
+    return 0.7 * tbn + 0.2 * tg + 0.1 * np.asarray(tbs, dtype=np.float64)
+
+
+def calcular_ibutg_janelas(medicoes: Sequence[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calcula o IBUTG e a taxa metabólica ponderados no tempo em janelas móveis de 60 minutos.
+
+    Cada conjunto de medições é um dicionário com as séries 'tbn', 'tg', 'tbs'
+    (opcional, para ambientes com carga solar) e 'metabolismo' (W por amostra,
+    representando os ciclos de atividade e descanso), além de 'intervalo'
+    (minutos entre amostras, padrão 1, divisor de 60). As amostras de todos os
+    conjuntos são concatenadas e, a partir das somas acumuladas dos valores
+    ponderados pela duração, a média de cada janela de 60 minutos consecutivos
+    é obtida pela diferença entre duas posições.
+
+    Args:
+        medicoes: Lista de conjuntos de medições
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (IBUTG por janela, taxa metabólica
+        por janela, índice da primeira janela de cada conjunto)
+    """
+    ibutg, metabolismo, duracao = [], [], []
+    n_amostras = np.zeros(len(medicoes), dtype=np.int64)
+    por_janela = np.zeros(len(medicoes), dtype=np.int64)
+
+    for i, medicao in enumerate(medicoes):
+        valores = np.ravel(calcular_ibutg(medicao['tbn'], medicao['tg'], medicao.get('tbs')))
+
+        intervalo = float(medicao.get('intervalo', 1.0))
+        if intervalo <= 0 or (60.0 / intervalo) % 1:
+            raise ValueError("Intervalo entre amostras deve ser um divisor de 60 minutos")
+        if valores.size * intervalo < 60:
+            raise ValueError("Conjunto de medições com menos de 60 minutos")
+
+        metabolismo_medicao = np.broadcast_to(
+            np.asarray(medicao.get('metabolismo', METABOLISMO_PADRAO), dtype=np.float64), valores.shape
+        )
+        if np.any(metabolismo_medicao <= 0):
+            raise ValueError("Taxa metabólica deve ser maior que zero")
+
+        n_amostras[i] = valores.size
+        por_janela[i] = round(60.0 / intervalo)
+        ibutg.append(valores)
+        metabolismo.append(metabolismo_medicao)
+        duracao.append(np.full(valores.size, intervalo))
+
+    if not ibutg:
+        return np.empty(0), np.empty(0), np.zeros(0, dtype=np.int64)
+
+    duracao = np.concatenate(duracao)
+    acumulado_tempo = np.concatenate([[0.0], np.cumsum(duracao)])
+    acumulado_ibutg = np.concatenate([[0.0], np.cumsum(np.concatenate(ibutg) * duracao)])
+    acumulado_metabolismo = np.concatenate([[0.0], np.cumsum(np.concatenate(metabolismo) * duracao)])
+
+    # Janelas de cada conjunto: uma por amostra inicial que ainda completa 60 minutos
+    n_janelas = n_amostras - por_janela + 1
+    inicio = np.concatenate([[0], np.cumsum(n_janelas)[:-1]])
+    deslocamento = np.concatenate([[0], np.cumsum(n_amostras)[:-1]])
+    conjunto = np.repeat(np.arange(len(medicoes)), n_janelas)
+    primeira = np.arange(n_janelas.sum()) - inicio[conjunto] + deslocamento[conjunto]
+    ultima = primeira + por_janela[conjunto]
+
+    tempo = acumulado_tempo[ultima] - acumulado_tempo[primeira]
+    ibutg_janela = (acumulado_ibutg[ultima] - acumulado_ibutg[primeira]) / tempo
+    metabolismo_janela = (acumulado_metabolismo[ultima] - acumulado_metabolismo[primeira]) / tempo
+
+    return ibutg_janela, metabolismo_janela, inicio
+
+
+def _janelas_criticas(ibutg_janela: np.ndarray, metabolismo_janela: np.ndarray, inicio: np.ndarray) -> List[Dict]:
+    """Seleciona, para cada regime, a janela com maior excesso sobre o limite em cada conjunto."""
+    criticas = [{} for _ in inicio]
+    for regime in range(len(FUNDAMENTOS)):
+        excesso = ibutg_janela - limite_ibutg(regime, metabolismo_janela)
+        maximo = np.maximum.reduceat(excesso, inicio)
+        contagem = np.diff(np.append(inicio, excesso.size))
+        posicoes = np.flatnonzero(excesso == np.repeat(maximo, contagem))
+        indices = posicoes[np.searchsorted(posicoes, inicio)]
+        for criticas_conjunto, indice in zip(criticas, indices):
+            criticas_conjunto[regime] = (float(ibutg_janela[indice]), float(metabolismo_janela[indice]))
+    return criticas
+
+
+def _formatar_subperiodos(data_inicio: datetime, data_fim: datetime, criticas: Dict) -> List[Dict]:
+    """Fragmenta o período e avalia cada subperíodo com o IBUTG e taxa metabólica do seu regime."""
+    subperiodos = fragmentar_periodo(data_inicio, data_fim, DATAS_CORTE)
+    resultados = []
+
+    for inicio_sub, fim_sub in subperiodos:
+        regime = obter_regime(inicio_sub, DATAS_CORTE)
+        ibutg, metabolismo = criticas[regime]
+        limite, fundamento = obter_limite_e_fundamento(inicio_sub, metabolismo)
+        ibutg = round(ibutg, 1)
+
+        resultados.append(formatar_resultado(
+            data_inicio=inicio_sub,
+            data_fim=fim_sub,
+            agente='calor',
+            intensidade=ibutg,
+            eh_especial=ibutg > limite,
+            limite=limite,
+            unidade='°C (IBUTG)',
+            detalhes={'metabolismo': round(metabolismo, 1)},
+            fundamento=fundamento
+        ))
+
+    return resultados
+
+
+def processar_periodo(data_inicio: datetime, data_fim: datetime, intensidade: float,
+                      metabolismo: float = METABOLISMO_PADRAO) -> List[Dict]:
+    """
+    Processa um período completo, fragmentando-o conforme as datas de corte.
+
+    Args:
+        data_inicio: Data de início do período
+        data_fim: Data de fim do período
+        intensidade: IBUTG médio dos 60 minutos mais críticos, em °C
+        metabolismo: Taxa metabólica média dos mesmos 60 minutos, em W
+
+    Returns:
+        Lista de dicionários contendo informações de cada subperíodo
+    """
+    if metabolismo <= 0:
+        raise ValueError("Taxa metabólica deve ser maior que zero")
+
+    criticas = {regime: (intensidade, metabolismo) for regime in range(len(FUNDAMENTOS))}
+    return _formatar_subperiodos(data_inicio, data_fim, criticas)
+
+
+def processar_medicoes(lote: Sequence[Dict]) -> List[List[Dict]]:
+    """
+    Processa um lote de períodos a partir das séries de temperatura medidas.
+
+    Cada item do lote contém 'data_inicio' e 'data_fim', além das séries
+    descritas em calcular_ibutg_janelas. Em cada subperíodo são considerados
+    os 60 minutos mais críticos segundo o limite vigente, já que o regime
+    define a relação entre IBUTG e taxa metabólica.
+
+    Args:
+        lote: Lista de períodos com suas medições
+
+    Returns:
+        Lista, na ordem do lote, com os subperíodos avaliados de cada período
+    """
+    ibutg_janela, metabolismo_janela, inicio = calcular_ibutg_janelas(lote)
+    criticas = _janelas_criticas(ibutg_janela, metabolismo_janela, inicio)
+    return [
+        _formatar_subperiodos(item['data_inicio'], item['data_fim'], criticas_item)
+        for item, criticas_item in zip(lote, criticas)
+    ]
+
 
 def avaliar_periodo(data_inicio: datetime, data_fim: datetime, ibutg: float) -> bool:
     """
     Avalia se um período é especial para exposição ao calor.
-    
+
     Args:
         data_inicio: Data de início do período
         data_fim: Data de fim do período
         ibutg: Índice de Bulbo Úmido Termômetro de Globo
-    
+
     Returns:
         bool: True se o período é especial, False caso contrário
     """
-    # Implementar critérios baseados no IBUTG
-    return ibutg > 25.0  # Valor de referência base
+    limite, _ = obter_limite_e_fundamento(data_inicio)
+    return ibutg > limite
@@ -1,53 +1,306 @@
-from datetime import datetime
-from typing import List, Dict
-from .utils import fragmentar_periodo, formatar_resultado
+from datetime import date, datetime
+from typing import List, Dict, Sequence, Tuple
+
+import numpy as np
+
+from .utils import fragmentar_periodo, formatar_resultado, formatar_data, obter_regime
 
 # Datas de corte para o agente radiação
 DATAS_CORTE = [
-    datetime(1997, 3, 6),  # Data exemplo - ajuste conforme a legislação
+    datetime(1997, 3, 6),  # Anexo 5 da NR-15 e limites da norma CNEN-NE-3.01/1988
+    datetime(2005, 1, 6),  # Norma CNEN-NN-3.01 (Resolução CNEN nº 27/2004)
+]
+
+# Limites de dose efetiva por regime: (anual, em 5 anos consecutivos), em mSv
+LIMITES = [
+    (None, None),
+    (50.0, None),
+    (50.0, 100.0),
+]
+
+FUNDAMENTOS = [
+    "código 1.1.4, do Anexo do Decreto Federal nº 53.831/1964, e código 1.1.3, do Anexo I do Decreto Federal nº 83.080/1979",
+    "código 2.0.3, do Anexo IV dos Decretos Federais nº 2.172/1997 e nº 3.048/1999, "
+    "c/c Anexo 5 da NR-15 e norma CNEN-NE-3.01/1988",
+    "código 2.0.3, do Anexo IV do Decreto Federal nº 3.048/1999, c/c Anexo 5 da NR-15 e norma CNEN-NN-3.01",
+]
+
+# Radiações não ionizantes: avaliação qualitativa em todos os regimes
+FUNDAMENTOS_NAO_IONIZANTE = [
+    "código 1.1.4, do Anexo do Decreto Federal nº 53.831/1964",
+    "Anexo 7 da NR-15",
+    "Anexo 7 da NR-15",
 ]
 
-def avaliar_subperiodo(data_inicio: datetime, data_fim: datetime, tipo_radiacao: str, dose: float) -> bool:
+# Número de meses das janelas de acumulação
+MESES_ANO = 12
+MESES_QUINQUENIO = 60
+
+
+def _mes(data) -> int:
+    """Converte uma data em índice absoluto de mês (ano * 12 + mês - 1)."""
+    return data.year * 12 + data.month - 1
+
+
+def _meses_registro(registro: Dict) -> Tuple[List[int], float]:
+    """Retorna os meses de um registro mensal ('data') ou anual ('ano', repartido entre os 12 meses) e a dose de cada mês."""
+    if 'ano' in registro:
+        return list(range(int(registro['ano']) * 12, int(registro['ano']) * 12 + 12)), float(registro['dose']) / 12
+    return [_mes(registro['data'])], float(registro['dose'])
+
+
+def _dias(meses: np.ndarray) -> np.ndarray:
+    """Converte índices absolutos de mês no primeiro dia de cada mês (datetime64[D])."""
+    return (meses - 1970 * 12).astype('datetime64[M]').astype('datetime64[D]')
+
+
+def _sequencias(contagens: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Para grupos com as contagens informadas, retorna o grupo e a posição de cada elemento no grupo."""
+    grupo = np.repeat(np.arange(contagens.size), contagens)
+    inicio = np.concatenate([[0], np.cumsum(contagens)[:-1]])
+    return grupo, np.arange(grupo.size) - inicio[grupo]
+
+
+def _segmentos(trabalhadores: Sequence[Dict]) -> List[Tuple[int, date, date, int, int]]:
     """
-    Avalia se um subperíodo é especial para exposição à radiação.
-    
+    Fragmenta o período de cada trabalhador e associa a cada subperíodo um intervalo de meses.
+
+    Cada mês pertence ao subperíodo que contém o seu primeiro dia, exceto o
+    mês inicial do período, sempre atribuído ao primeiro subperíodo.
+    """
+    segmentos = []
+    for i, trabalhador in enumerate(trabalhadores):
+        data_inicio, data_fim = trabalhador['data_inicio'], trabalhador['data_fim']
+        if isinstance(data_inicio, datetime):
+            data_inicio = data_inicio.date()
+        if isinstance(data_fim, datetime):
+            data_fim = data_fim.date()
+
+        for k, (inicio_sub, fim_sub) in enumerate(fragmentar_periodo(data_inicio, data_fim, DATAS_CORTE)):
+            primeiro = _mes(inicio_sub) if k == 0 or inicio_sub.day == 1 else _mes(inicio_sub) + 1
+            segmentos.append((i, inicio_sub, fim_sub, primeiro, max(primeiro, _mes(fim_sub) + 1)))
+    return segmentos
+
+
+def calcular_janelas(trabalhadores: Sequence[Dict]) -> Dict:
+    """
+    Calcula, para cada subperíodo, as doses por ano civil e em janelas móveis de cinco anos.
+
+    Os registros de todos os trabalhadores são lançados em uma única grade
+    mensal (um segmento por trabalhador), da qual se extrai a soma acumulada.
+    As janelas de cada subperíodo começam dentro dele e são recortadas aos seus
+    meses, de modo que doses de outros regimes não sejam computadas; a dose de
+    cada janela é obtida em O(1) pela diferença entre duas posições da soma
+    acumulada.
+
+    Args:
+        trabalhadores: Lista de dicionários com 'data_inicio', 'data_fim' e
+            'registros' (cada registro com 'dose' em mSv e 'data' ou 'ano')
+
+    Returns:
+        Dict: 'segmentos' (trabalhador, início e fim do subperíodo, meses);
+        para 'anual' e 'quinquenal', arrays 'inicio' e 'fim' (índices de mês,
+        fim exclusivo) e 'dose'; e 'limites', com a posição das janelas de
+        cada segmento
+    """
+    n = len(trabalhadores)
+    segmentos = _segmentos(trabalhadores)
+    primeiro_mes = np.empty(n, dtype=np.int64)
+    n_meses = np.empty(n, dtype=np.int64)
+    meses, doses = [], []
+
+    for i, trabalhador in enumerate(trabalhadores):
+        mes, dose = [], []
+        for registro in trabalhador.get('registros', []):
+            meses_registro, dose_mes = _meses_registro(registro)
+            if dose_mes < 0:
+                raise ValueError("Dose de radiação não pode ser negativa")
+            mes.extend(meses_registro)
+            dose.extend([dose_mes] * len(meses_registro))
+
+        extremos = [_mes(trabalhador['data_inicio']), _mes(trabalhador['data_fim'])] + mes
+        primeiro_mes[i] = min(extremos)
+        n_meses[i] = max(extremos) - primeiro_mes[i] + 1
+
+        meses.append(np.array(mes, dtype=np.int64))
+        doses.append(np.array(dose, dtype=np.float64))
+
+    deslocamento = np.concatenate([[0], np.cumsum(n_meses)])
+    dono = np.repeat(np.arange(n), [m.size for m in meses])
+    posicao = np.concatenate(meses + [np.empty(0, dtype=np.int64)]) - primeiro_mes[dono] + deslocamento[dono]
+    grade = np.bincount(posicao, weights=np.concatenate(doses + [np.empty(0)]), minlength=deslocamento[-1])
+    acumulado = np.concatenate([[0.0], np.cumsum(grade)])
+
+    trabalhador = np.array([seg[0] for seg in segmentos], dtype=np.int64)
+    inicio_seg = np.array([seg[3] for seg in segmentos], dtype=np.int64)
+    fim_seg = np.array([seg[4] for seg in segmentos], dtype=np.int64)
+    vazio = fim_seg <= inicio_seg
+
+    def _doses(seg: np.ndarray, inicio: np.ndarray, fim: np.ndarray) -> np.ndarray:
+        base = deslocamento[trabalhador[seg]] - primeiro_mes[trabalhador[seg]]
+        return acumulado[fim + base] - acumulado[inicio + base]
+
+    # Anos civis recortados aos meses do subperíodo
+    n_anos = np.where(vazio, 0, (fim_seg - 1) // 12 - inicio_seg // 12 + 1)
+    seg, k = _sequencias(n_anos)
+    ano = (inicio_seg[seg] // 12 + k) * 12
+    inicio = np.maximum(ano, inicio_seg[seg])
+    fim = np.minimum(ano + MESES_ANO, fim_seg[seg])
+    anual = {'inicio': inicio, 'fim': fim, 'dose': _doses(seg, inicio, fim)}
+    limites_anual = np.concatenate([[0], np.cumsum(n_anos)])
+
+    # Janelas móveis de 60 meses iniciadas no subperíodo, truncadas no seu fim
+    n_janelas = np.where(vazio, 0, np.maximum(fim_seg - MESES_QUINQUENIO - inicio_seg, 0) + 1)
+    seg, k = _sequencias(n_janelas)
+    inicio = inicio_seg[seg] + k
+    fim = np.minimum(inicio + MESES_QUINQUENIO, fim_seg[seg])
+    quinquenal = {'inicio': inicio, 'fim': fim, 'dose': _doses(seg, inicio, fim)}
+    limites_quinquenal = np.concatenate([[0], np.cumsum(n_janelas)])
+
+    return {
+        'segmentos': segmentos,
+        'anual': anual,
+        'quinquenal': quinquenal,
+        'limites': {'anual': limites_anual, 'quinquenal': limites_quinquenal},
+    }
+
+
+def _janelas_segmento(janelas: Dict, tipo: str, s: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Retorna as datas de início e fim (limitadas ao subperíodo) e as doses das janelas de um segmento."""
+    _, inicio_sub, fim_sub, _, _ = janelas['segmentos'][s]
+    a, b = janelas['limites'][tipo][s:s + 2]
+    dados = janelas[tipo]
+    inicio = np.maximum(_dias(dados['inicio'][a:b]), np.datetime64(inicio_sub))
+    fim = np.minimum(_dias(dados['fim'][a:b]) - np.timedelta64(1, 'D'), np.datetime64(fim_sub))
+    return inicio, fim, dados['dose'][a:b]
+
+
+def _janela_excedida(tipo: str, janelas: Tuple, j: int, limite: float) -> Dict:
+    """Formata uma janela de acumulação cuja dose supera o limite."""
+    inicios, fins, doses = janelas
+    return {
+        'janela': tipo,
+        'data_inicio': formatar_data(inicios[j].item()),
+        'data_fim': formatar_data(fins[j].item()),
+        'dose': round(float(doses[j]), 4),
+        'limite': limite,
+    }
+
+
+def _avaliar_segmento(tipo_radiacao: str, janelas: Dict, s: int) -> Dict:
+    """Avalia um subperíodo a partir das janelas já calculadas."""
+    _, inicio_sub, fim_sub, _, _ = janelas['segmentos'][s]
+    anual = _janelas_segmento(janelas, 'anual', s)
+    quinquenal = _janelas_segmento(janelas, 'quinquenal', s)
+
+    regime = obter_regime(inicio_sub, DATAS_CORTE)
+    dose_anual = float(anual[2].max()) if anual[2].size else 0.0
+    dose_quinquenal = float(quinquenal[2].max()) if quinquenal[2].size else 0.0
+
+    ionizante = tipo_radiacao.lower() == 'ionizante'
+    limite_anual, limite_quinquenal = LIMITES[regime]
+
+    # Anos civis acima do limite e, das janelas móveis de cinco anos (que se
+    # sobrepõem), apenas a de maior dose e a quantidade acima do limite
+    excedidas = []
+    n_quinquenios = 0
+    if ionizante and limite_anual is not None:
+        for j in np.flatnonzero(anual[2] > limite_anual):
+            excedidas.append(_janela_excedida('anual', anual, j, limite_anual))
+    if ionizante and limite_quinquenal is not None:
+        n_quinquenios = int(np.count_nonzero(quinquenal[2] > limite_quinquenal))
+        if n_quinquenios:
+            j = int(np.argmax(quinquenal[2]))
+            excedidas.append(_janela_excedida('quinquenal', quinquenal, j, limite_quinquenal))
+
+    if ionizante:
+        eh_especial = regime == 0 or bool(excedidas)
+    else:
+        eh_especial = dose_anual > 0
+
+    qualitativo = regime == 0 or not ionizante
+
+    # Quando apenas o limite de cinco anos é superado, este é o critério reportado
+    intensidade, limite, unidade = dose_anual, limite_anual, 'mSv'
+    if excedidas and excedidas[0]['janela'] == 'quinquenal':
+        intensidade, limite, unidade = dose_quinquenal, limite_quinquenal, 'mSv em 5 anos'
+
+    return formatar_resultado(
+        data_inicio=inicio_sub,
+        data_fim=fim_sub,
+        agente='radiacao',
+        intensidade=round(intensidade, 4),
+        eh_especial=eh_especial,
+        limite=None if qualitativo else limite,
+        unidade=unidade,
+        detalhes={
+            'tipo_radiacao': tipo_radiacao,
+            'dose_quinquenal_maxima': round(dose_quinquenal, 4),
+            'limite_quinquenal': None if qualitativo else limite_quinquenal,
+            'quinquenios_excedidos': n_quinquenios,
+            'janelas_excedidas': excedidas,
+        },
+        fundamento=FUNDAMENTOS[regime] if ionizante else FUNDAMENTOS_NAO_IONIZANTE[regime]
+    )
+
+
+def processar_lote(trabalhadores: Sequence[Dict]) -> List[List[Dict]]:
+    """
+    Processa os históricos de dose de vários trabalhadores de uma só vez.
+
+    Args:
+        trabalhadores: Lista de dicionários com 'data_inicio', 'data_fim',
+            'registros' e, opcionalmente, 'tipo_radiacao' (ver calcular_janelas)
+
+    Returns:
+        Lista, na ordem de entrada, com os subperíodos avaliados de cada trabalhador
+    """
+    janelas = calcular_janelas(trabalhadores)
+    resultados = [[] for _ in trabalhadores]
+    for s, (i, *_) in enumerate(janelas['segmentos']):
+        tipo_radiacao = trabalhadores[i].get('tipo_radiacao', 'ionizante')
+        resultados[i].append(_avaliar_segmento(tipo_radiacao, janelas, s))
+    return resultados
+
+
+def processar_periodo(data_inicio: datetime, data_fim: datetime, intensidade: float,
+                      tipo_radiacao: str = 'ionizante', registros: List[Dict] = None) -> List[Dict]:
+    """
+    Processa um período completo, fragmentando-o conforme as datas de corte.
+
     Args:
         data_inicio: Data de início do período
         data_fim: Data de fim do período
+        intensidade: Dose anual de radiação em mSv, usada quando não há registros
         tipo_radiacao: Tipo de radiação (ionizante, não-ionizante)
-        dose: Dose de exposição
+        registros: Registros mensais ('data') ou anuais ('ano') de dose em mSv
+
+    Returns:
+        Lista de dicionários contendo informações de cada subperíodo
     """
-    if tipo_radiacao.lower() == 'ionizante':
-        return True
-    return dose > 0
+    if registros is None:
+        registros = [{'ano': ano, 'dose': intensidade} for ano in range(data_inicio.year, data_fim.year + 1)]
+
+    trabalhador = {
+        'data_inicio': data_inicio,
+        'data_fim': data_fim,
+        'registros': registros,
+        'tipo_radiacao': tipo_radiacao,
+    }
+    return processar_lote([trabalhador])[0]
+
 
 def avaliar_periodo(data_inicio: datetime, data_fim: datetime, intensidade: float, tipo_radiacao: str = 'ionizante') -> List[Dict]:
     """
     Avalia um período completo para exposição à radiação.
-    
+
     Args:
         data_inicio: Data de início do período
         data_fim: Data de fim do período
         intensidade: Dose de radiação
         tipo_radiacao: Tipo de radiação (ionizante, não-ionizante)
-    
+
     Returns:
         Lista de dicionários contendo informações de cada subperíodo
     """
-    subperiodos = fragmentar_periodo(data_inicio, data_fim, DATAS_CORTE)
-    resultados = []
-    
-    for inicio_sub, fim_sub in subperiodos:
-        eh_especial = avaliar_subperiodo(inicio_sub, fim_sub, tipo_radiacao, intensidade)
-        
-        resultados.append(formatar_resultado(
-            data_inicio=inicio_sub,
-            data_fim=fim_sub,
-            agente='radiacao',
-            intensidade=intensidade,
-            eh_especial=eh_especial,
-            unidade='mSv',
-            detalhes={'tipo_radiacao': tipo_radiacao}
-        ))
-    
-    return resultados
+    return processar_periodo(data_inicio, data_fim, intensidade, tipo_radiacao)
@@ -49,6 +49,29 @@ def fragmentar_periodo(data_inicio, data_fim, datas_corte):
     
     return periodos
 
+def obter_regime(data, datas_corte):
+    """
+    Retorna o índice do regime normativo vigente na data especificada.
+    
+    Args:
+        data (date): Data a ser avaliada
+        datas_corte (list): Lista de datas que representam mudanças na legislação
+    
+    Returns:
+        int: Quantidade de datas de corte alcançadas até a data (0 antes da primeira)
+    """
+    if isinstance(data, datetime):
+        data = data.date()
+    
+    regime = 0
+    for data_corte in datas_corte:
+        if isinstance(data_corte, datetime):
+            data_corte = data_corte.date()
+        if data >= data_corte:
+            regime += 1
+    
+    return regime
+
 def formatar_resultado(data_inicio, data_fim, agente, intensidade, eh_especial, limite=None, unidade="", detalhes=None, fundamento=None):
     """
     Formata o resultado da análise de um subperíodo.
@@ -143,7 +143,8 @@ def avaliar_periodo(data_inicio: datetime, data_fim: datetime, intensidade: floa
     
     return eh_especial, mensagem, dados
 
-def processar_periodo(data_inicio: datetime, data_fim: datetime, intensidade: float, unidade: str = None) -> List[Dict]:
+def processar_periodo(data_inicio: datetime, data_fim: datetime, intensidade: float, unidade: str = None,
+                      metricas: Dict = None) -> List[Dict]:
     """
     Processa um período de exposição à vibração, fragmentando-o conforme as datas de corte.
     
@@ -152,6 +153,8 @@ def processar_periodo(data_inicio: datetime, data_fim: datetime, intensidade: fl
         data_fim: Data de fim do período
         intensidade: Nível de vibração
         unidade: Unidade de medida ('gpm', 'ms2' ou 'ms175')
+        metricas: Valores calculados por unidade (ex.: acelerometria.calcular_metricas),
+            usados no lugar da intensidade informada quando disponível a unidade correta
     
     Returns:
         List[Dict]: Lista de subperíodos com suas respectivas avaliações
@@ -167,7 +170,13 @@ def processar_periodo(data_inicio: datetime, data_fim: datetime, intensidade: fl
     resultados = []
     
     for inicio_sub, fim_sub in subperiodos:
-        eh_especial, mensagem, dados = avaliar_periodo(inicio_sub, fim_sub, intensidade, unidade)
+        intensidade_sub, unidade_sub = intensidade, unidade
+        if metricas:
+            unidade_correta = get_unidade_e_limite(fim_sub, unidade)[0]
+            if metricas.get(unidade_correta) is not None:
+                intensidade_sub, unidade_sub = metricas[unidade_correta], unidade_correta
+        
+        eh_especial, mensagem, dados = avaliar_periodo(inicio_sub, fim_sub, intensidade_sub, unidade_sub)
         
         resultados.append({
             'data_inicio': formatar_data(inicio_sub),
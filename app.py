@@ -1,10 +1,11 @@
 from flask import Flask, render_template, request, jsonify
 from datetime import datetime
-from agentes import ruido, agentes_quimicos, vibracao, calor, radiacao, eletricidade
+from agentes import ruido, agentes_quimicos, vibracao, calor, radiacao, eletricidade, acelerometria
 from agentes.utils import DATA_FORMAT, formatar_data
 from itertools import groupby
 from operator import itemgetter
 import os
+import tempfile
 
 app = Flask(__name__, 
     static_url_path='',
@@ -39,6 +40,42 @@ FUNDAMENTOS_LEGAIS = {
 def index():
     return render_template('index.html')
 
+@app.route('/acelerometria', methods=['POST'])
+def processar_acelerometria():
+    try:
+        arquivo = request.files.get('arquivo')
+        if not arquivo or not arquivo.filename:
+            return jsonify({'error': 'Arquivo de aceleração não enviado'}), 400
+
+        try:
+            taxa_amostragem = float(request.form['taxa_amostragem'])
+            tempo_exposicao = float(request.form['tempo_exposicao'])
+        except (KeyError, ValueError):
+            return jsonify({'error': 'Taxa de amostragem e tempo de exposição diário são obrigatórios'}), 400
+
+        # O registro é gravado em arquivo temporário para ser lido em blocos via memória mapeada
+        descritor, caminho = tempfile.mkstemp(suffix=os.path.splitext(arquivo.filename)[1])
+        os.close(descritor)
+        try:
+            arquivo.save(caminho)
+            metricas = acelerometria.calcular_metricas(
+                caminho,
+                taxa_amostragem,
+                tempo_exposicao,
+                formato=request.form.get('formato', 'csv'),
+                separador=request.form.get('separador') or ',',
+                decimal=request.form.get('decimal') or '.'
+            )
+        finally:
+            os.remove(caminho)
+
+        return jsonify(metricas)
+
+    except ValueError as e:
+        return jsonify({'error': f"Erro ao processar registro de aceleração: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({'error': f"Erro interno: {str(e)}"}), 500
+
 @app.route('/avaliar', methods=['POST'])
 def avaliar():
     try:
@@ -89,12 +126,43 @@ def avaliar():
                     if periodo['unidade_medida'] not in ['gpm', 'ms2', 'ms175']:
                         raise ValueError("Unidade de medida inválida para vibração")
                     
+                    # Métricas calculadas a partir do registro do acelerômetro (rota /acelerometria)
+                    metricas = periodo.get('metricas') or None
+                    if metricas is not None:
+                        try:
+                            metricas = {unidade: float(metricas[unidade]) for unidade in ['ms2', 'ms175']}
+                        except (KeyError, TypeError, ValueError):
+                            raise ValueError("Métricas de aceleração inválidas")
+                    
                     # Processa o período com o módulo de vibração incluindo a unidade
                     subperiodos = agente.processar_periodo(
                         data_inicio,
                         data_fim,
                         intensidade,
-                        periodo['unidade_medida']
+                        periodo['unidade_medida'],
+                        metricas
+                    )
+                elif periodo['agente'] == 'calor':
+                    # Taxa metabólica em W; quando não informada, adota-se a do módulo de calor
+                    try:
+                        metabolismo = float(periodo.get('metabolismo') or calor.METABOLISMO_PADRAO)
+                    except ValueError:
+                        raise ValueError("Taxa metabólica inválida")
+                    
+                    subperiodos = agente.processar_periodo(data_inicio, data_fim, intensidade, metabolismo)
+                elif periodo['agente'] == 'agentes_quimicos':
+                    if not periodo.get('substancia'):
+                        raise ValueError("Substância é obrigatória para agentes químicos")
+                    if (periodo.get('unidade_medida') or 'ppm') not in ['ppm', 'mg/m3']:
+                        raise ValueError("Unidade de medida inválida para agentes químicos")
+                    
+                    # Processa o período com o catálogo de agentes químicos
+                    subperiodos = agente.processar_periodo(
+                        data_inicio,
+                        data_fim,
+                        intensidade,
+                        periodo['substancia'],
+                        periodo.get('unidade_medida') or 'ppm'
                     )
                 else:
                     # Processa o período com o módulo do agente específico
@@ -121,6 +189,21 @@ def avaliar():
     except Exception as e:
         return jsonify({'error': f"Erro interno: {str(e)}"}), 500
 
+def unidade_informada(periodo, subperiodo):
+    # A dose de radiação informada é anual, ainda que o subperíodo seja avaliado em janela de 5 anos
+    if periodo['agente'] == 'radiacao':
+        return 'mSv'
+    return subperiodo.get('unidade', '')
+
+def taxa_metabolica(periodo, subperiodo):
+    # O limite de IBUTG depende da taxa metabólica a partir de 06/03/1997
+    if periodo['agente'] != 'calor' or subperiodo['fundamento'] == calor.FUNDAMENTOS[0]:
+        return ''
+    texto = f", para taxa metabólica de {subperiodo['detalhes']['metabolismo']} W"
+    if not periodo.get('metabolismo'):
+        texto += " (adotada por não ter sido informada)"
+    return texto
+
 def gerar_minuta(resultados):
     # Agrupa os resultados por período original
     periodos_agrupados = {}
@@ -153,7 +236,7 @@ def gerar_minuta(resultados):
                 f"{periodo['agente'].replace('_', ' ')} o período de "
                 f"{periodo['data_inicio']} a {periodo['data_fim']}, com "
                 f"exposição a um nível de {periodo['intensidade']} "
-                f"{resultados[0]['subperiodo'].get('unidade', '')}."
+                f"{unidade_informada(periodo, resultados[0]['subperiodo'])}."
             )
         minuta.append(texto)
         minuta.append("")
@@ -178,7 +261,7 @@ def gerar_minuta(resultados):
                     f"De {periodo['data_inicio']} a {periodo['data_fim']}, "
                     f"em razão do agente nocivo {periodo['agente'].replace('_', ' ')}, "
                     f"com exposição a um nível de {periodo['intensidade']} "
-                    f"{resultados[0]['subperiodo'].get('unidade', '')}"
+                    f"{unidade_informada(periodo, resultados[0]['subperiodo'])}"
                 )
             minuta.append(texto + ("." if i == len(periodos) - 1 else ";"))
         minuta.append("")
@@ -208,6 +291,10 @@ def gerar_minuta(resultados):
         agente = periodo_original['agente']
         intensidade = periodo_original['intensidade']
         
+        # Para radiação, a dose avaliada é a acumulada na janela de cada subperíodo
+        if agente == 'radiacao':
+            intensidade = subperiodo['intensidade']
+        
         if agente == 'vibracao':
             if not subperiodo['eh_especial']:
                 # Verifica se é caso de unidade inadequada
@@ -223,20 +310,41 @@ def gerar_minuta(resultados):
                     f"O período de {subperiodo['data_inicio']} a {subperiodo['data_fim']} "
                     f"deve ser enquadrado como especial, {subperiodo['mensagem']}."
                 )
+        elif subperiodo.get('detalhes', {}).get('criterio') == 'nao_catalogado':
+            # Substância sem limite de tolerância ou critério qualitativo no catálogo
+            texto = (
+                f"O período de {subperiodo['data_inicio']} a {subperiodo['data_fim']} "
+                f"não pode ser enquadrado automaticamente como especial, em razão de a substância "
+                f"{subperiodo['detalhes']['substancia']} não constar do catálogo de substâncias dos "
+                f"Anexos 11 e 13 da NR-15 utilizado nesta análise, devendo a exposição ser examinada "
+                f"individualmente."
+            )
+        elif 'limite' not in subperiodo:
+            # Avaliação qualitativa, sem limite de tolerância aplicável
+            texto = (
+                f"O período de {subperiodo['data_inicio']} a {subperiodo['data_fim']} "
+                f"{'deve' if subperiodo['eh_especial'] else 'não deve'} ser enquadrado como especial, "
+                f"em razão de a exposição a {agente.replace('_', ' ')} ser avaliada de forma qualitativa"
+            )
+            if subperiodo.get('fundamento'):
+                texto += f", nos termos do {subperiodo['fundamento']}"
+            texto += "."
         else:
+            taxa = taxa_metabolica(periodo_original, subperiodo)
             if subperiodo['eh_especial']:
                 texto = (
                     f"O período de {subperiodo['data_inicio']} a {subperiodo['data_fim']} "
                     f"deve ser enquadrado como especial, em razão de exposição a {agente.replace('_', ' ')} de "
                     f"{intensidade} {subperiodo['unidade']}, superior ao limite de "
-                    f"{subperiodo['limite']}{subperiodo['unidade']} previsto no "
+                    f"{subperiodo['limite']}{subperiodo['unidade']}{taxa}{',' if taxa else ''} previsto no "
                     f"{subperiodo['fundamento']}."
                 )
             else:
                 texto = (
                     f"O período de {subperiodo['data_inicio']} a {subperiodo['data_fim']} "
                     f"não deve ser enquadrado como especial, por não ultrapassar o limite de "
-                    f"{subperiodo['limite']}{subperiodo['unidade']}, previsto no {subperiodo['fundamento']}."
+                    f"{subperiodo['limite']}{subperiodo['unidade']}{taxa}, "
+                    f"previsto no {subperiodo['fundamento']}."
                 )
         
         minuta.append(texto)
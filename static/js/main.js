@@ -36,6 +36,14 @@ function templatePeriodo(id) {
                             <option value="ms175">m/s1,75 (VDVR)</option>
                             <option value="gpm">golpes/min</option>
                         </select>
+                        <select class="form-select d-none" name="unidade_quimico" style="max-width: 110px;">
+                            <option value="ppm">ppm</option>
+                            <option value="mg/m3">mg/m³</option>
+                        </select>
+                        <input type="text" class="form-control d-none" name="substancia"
+                               placeholder="Substância ou CAS">
+                        <input type="number" step="any" min="0" class="form-control d-none" name="metabolismo"
+                               placeholder="Taxa metabólica (W)" title="Taxa metabólica média dos 60 minutos mais críticos, em W">
                     </div>
                 </div>
                 <div class="col-md-1 d-flex align-items-end">
@@ -44,6 +52,21 @@ function templatePeriodo(id) {
                     </button>
                 </div>
             </div>
+            <div class="row g-3 mt-0 d-none" data-campos="acelerometria">
+                <div class="col-md-6">
+                    <label class="form-label">Registro do acelerômetro (opcional)</label>
+                    <input type="file" class="form-control" name="arquivo_aceleracao" accept=".csv,.txt,.bin,.dat"
+                           onchange="atualizarCamposAcelerometria(this)">
+                </div>
+                <div class="col-md-3">
+                    <label class="form-label">Taxa de amostragem (Hz)</label>
+                    <input type="number" step="any" min="0" class="form-control" name="taxa_amostragem">
+                </div>
+                <div class="col-md-3">
+                    <label class="form-label">Exposição diária (h)</label>
+                    <input type="number" step="any" min="0" max="24" class="form-control" name="tempo_exposicao">
+                </div>
+            </div>
         </div>
     `;
 }
@@ -92,11 +115,52 @@ function copiarMinuta() {
         .catch(err => console.error('Erro ao copiar minuta:', err));
 }
 
+// Com registro do acelerômetro, a intensidade é calculada e os parâmetros do registro passam a ser obrigatórios
+function atualizarCamposAcelerometria(input) {
+    const periodo = input.closest('.periodo');
+    const comArquivo = input.files.length > 0;
+    periodo.querySelector('[name="intensidade"]').required = !comArquivo;
+    periodo.querySelector('[name="taxa_amostragem"]').required = comArquivo;
+    periodo.querySelector('[name="tempo_exposicao"]').required = comArquivo;
+}
+
+// Envia o registro do acelerômetro e retorna as métricas calculadas (aren e VDVR)
+async function calcularMetricas(periodo) {
+    const arquivo = periodo.querySelector('[name="arquivo_aceleracao"]').files[0];
+    const formData = new FormData();
+    formData.append('arquivo', arquivo);
+    formData.append('formato', /\.(csv|txt)$/i.test(arquivo.name) ? 'csv' : 'binario');
+    formData.append('taxa_amostragem', periodo.querySelector('[name="taxa_amostragem"]').value);
+    formData.append('tempo_exposicao', periodo.querySelector('[name="tempo_exposicao"]').value);
+
+    const response = await fetch('/acelerometria', { method: 'POST', body: formData });
+    const data = await response.json();
+    if (data.error) {
+        throw new Error(data.error);
+    }
+    return data;
+}
+
 // Função para atualizar campos baseado no agente selecionado
 function atualizarCamposAgente(select) {
     const periodo = select.closest('.periodo');
     const unidadeSelect = periodo.querySelector('[name="unidade_medida"]');
     const intensidadeInput = periodo.querySelector('[name="intensidade"]');
+    const substanciaInput = periodo.querySelector('[name="substancia"]');
+    
+    const unidadeQuimicoSelect = periodo.querySelector('[name="unidade_quimico"]');
+    
+    substanciaInput.classList.toggle('d-none', select.value !== 'agentes_quimicos');
+    unidadeQuimicoSelect.classList.toggle('d-none', select.value !== 'agentes_quimicos');
+    substanciaInput.required = select.value === 'agentes_quimicos';
+    periodo.querySelector('[name="metabolismo"]').classList.toggle('d-none', select.value !== 'calor');
+    
+    const arquivoInput = periodo.querySelector('[name="arquivo_aceleracao"]');
+    periodo.querySelector('[data-campos="acelerometria"]').classList.toggle('d-none', select.value !== 'vibracao');
+    if (select.value !== 'vibracao') {
+        arquivoInput.value = '';
+    }
+    atualizarCamposAcelerometria(arquivoInput);
     
     if (select.value === 'vibracao') {
         unidadeSelect.classList.remove('d-none');
@@ -104,7 +168,8 @@ function atualizarCamposAgente(select) {
         intensidadeInput.setAttribute('step', '0.01');
     } else {
         unidadeSelect.classList.add('d-none');
-        intensidadeInput.setAttribute('step', '0.1');
+        // Concentrações químicas podem ter várias casas decimais (ex.: mercúrio em mg/m³)
+        intensidadeInput.setAttribute('step', select.value === 'agentes_quimicos' ? 'any' : '0.1');
     }
 }
 
@@ -112,22 +177,38 @@ function atualizarCamposAgente(select) {
 document.getElementById('periodoForm').addEventListener('submit', async (e) => {
     e.preventDefault();
     
-    const periodos = Array.from(document.querySelectorAll('.periodo')).map(periodo => {
-        const dataInicio = periodo.querySelector('[name="data_inicio"]');
-        const dataFim = periodo.querySelector('[name="data_fim"]');
-        const agente = periodo.querySelector('[name="agente"]').value;
-        const unidadeSelect = periodo.querySelector('[name="unidade_medida"]');
-        
-        return {
-            data_inicio: dataInicio.getAttribute('data-valor-formatado') || formatarData(dataInicio.value),
-            data_fim: dataFim.getAttribute('data-valor-formatado') || formatarData(dataFim.value),
-            agente: agente,
-            intensidade: periodo.querySelector('[name="intensidade"]').value,
-            unidade_medida: agente === 'vibracao' ? unidadeSelect.value : null
-        };
-    });
-
     try {
+        const periodos = await Promise.all(Array.from(document.querySelectorAll('.periodo')).map(async periodo => {
+            const dataInicio = periodo.querySelector('[name="data_inicio"]');
+            const dataFim = periodo.querySelector('[name="data_fim"]');
+            const agente = periodo.querySelector('[name="agente"]').value;
+            const unidadeSelect = periodo.querySelector('[name="unidade_medida"]');
+            const unidadeQuimicoSelect = periodo.querySelector('[name="unidade_quimico"]');
+            let intensidade = periodo.querySelector('[name="intensidade"]').value;
+            
+            // Para vibração com registro do acelerômetro, as métricas calculadas substituem a intensidade informada
+            let metricas = null;
+            if (agente === 'vibracao' && periodo.querySelector('[name="arquivo_aceleracao"]').files.length) {
+                if (!intensidade && unidadeSelect.value === 'gpm') {
+                    throw new Error('O registro do acelerômetro não fornece golpes por minuto: informe a intensidade.');
+                }
+                metricas = await calcularMetricas(periodo);
+                intensidade = intensidade || String(metricas[unidadeSelect.value]);
+            }
+            
+            return {
+                data_inicio: dataInicio.getAttribute('data-valor-formatado') || formatarData(dataInicio.value),
+                data_fim: dataFim.getAttribute('data-valor-formatado') || formatarData(dataFim.value),
+                agente: agente,
+                intensidade: intensidade,
+                unidade_medida: agente === 'vibracao' ? unidadeSelect.value
+                    : agente === 'agentes_quimicos' ? unidadeQuimicoSelect.value : null,
+                substancia: agente === 'agentes_quimicos' ? periodo.querySelector('[name="substancia"]').value : null,
+                metabolismo: agente === 'calor' ? periodo.querySelector('[name="metabolismo"]').value : null,
+                metricas: metricas
+            };
+        }));
+
         const response = await fetch('/avaliar', {
             method: 'POST',
             headers: {
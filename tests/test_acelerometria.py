@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from scipy import signal
+
+from agentes import acelerometria
+
+TAXA = 1000.0
+
+
+def _magnitude(nome, frequencia, taxa=4000.0):
+    _, resposta = signal.sosfreqz(acelerometria.filtro_ponderacao(nome, taxa), worN=[frequencia], fs=taxa)
+    return abs(resposta[0])
+
+
+@pytest.mark.parametrize('nome, frequencia, esperado', [
+    ('Wk', 1.0, 0.482),
+    ('Wk', 5.0, 1.039),
+    ('Wk', 6.3, 1.054),
+    ('Wk', 16.0, 0.768),
+    ('Wd', 1.0, 1.011),
+    ('Wd', 2.0, 0.890),
+])
+def test_ponderacao_segue_tabelas_da_iso_2631_1(nome, frequencia, esperado):
+    assert _magnitude(nome, frequencia) == pytest.approx(esperado, abs=2e-3)
+
+
+def _senoide_z(duracao=60.0):
+    t = np.arange(0, duracao, 1 / TAXA)
+    amostras = np.zeros((t.size, 3))
+    amostras[:, 2] = np.sin(2 * np.pi * 5 * t)
+    return amostras
+
+
+def test_senoide_de_5_hz_no_eixo_z(tmp_path):
+    caminho = tmp_path / 'registro.csv'
+    np.savetxt(caminho, _senoide_z(), delimiter=',', fmt='%.6f', header='x,y,z', comments='')
+
+    metricas = acelerometria.calcular_metricas(str(caminho), TAXA, 8.0)
+
+    assert metricas['ms2'] == pytest.approx(0.7345, abs=1e-3)
+    assert metricas['detalhes']['amj'][:2] == [0.0, 0.0]
+
+
+def test_csv_e_binario_produzem_o_mesmo_resultado(tmp_path):
+    amostras = _senoide_z()
+    csv, binario = tmp_path / 'registro.csv', tmp_path / 'registro.bin'
+    np.savetxt(csv, amostras, delimiter=',', fmt='%.6f')
+    amostras.astype('<f4').tofile(binario)
+
+    por_csv = acelerometria.calcular_metricas(str(csv), TAXA, 4.0)
+    por_binario = acelerometria.calcular_metricas(str(binario), TAXA, 4.0, formato='binario')
+
+    assert por_csv['ms2'] == pytest.approx(por_binario['ms2'], abs=1e-4)
+    assert por_csv['ms175'] == pytest.approx(por_binario['ms175'], abs=1e-3)
+
+
+def test_tempo_de_exposicao_obrigatorio(tmp_path):
+    caminho = tmp_path / 'registro.csv'
+    np.savetxt(caminho, _senoide_z(1.0), delimiter=',')
+
+    with pytest.raises(ValueError):
+        acelerometria.calcular_metricas(str(caminho), TAXA, 0)
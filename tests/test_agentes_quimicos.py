@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+
+from agentes import agentes_quimicos
+
+# Período inteiramente sob os limites do Anexo 11 da NR-15
+INICIO, FIM = datetime(2000, 1, 1), datetime(2001, 1, 1)
+
+
+def _avaliar(amostras):
+    return agentes_quimicos.processar_amostras(INICIO, FIM, amostras)
+
+
+def test_media_ponderada_agrupada_por_substancia():
+    resultados = _avaliar([
+        {'substancia': 'Tolueno', 'concentracao': 60.0, 'duracao': 240},
+        {'substancia': 'acetona', 'concentracao': 100.0, 'duracao': 480},
+        {'substancia': '108-88-3', 'concentracao': 100.0, 'duracao': 240},
+    ])
+
+    assert [r['detalhes']['substancia'] for r in resultados] == ['Tolueno', 'Acetona']
+    assert resultados[0]['intensidade'] == 80.0
+    assert resultados[0]['eh_especial'] is True
+    assert resultados[1]['eh_especial'] is False
+
+
+def test_amostras_em_ppm_e_mg_m3_sao_combinadas_pela_fracao_do_limite():
+    # 0,5 do limite em ppm e 1,6 do limite em mg/m³, por tempos iguais
+    resultados = _avaliar([
+        {'substancia': 'Tolueno', 'concentracao': 39.0, 'unidade': 'ppm', 'duracao': 240},
+        {'substancia': 'Tolueno', 'concentracao': 464.0, 'unidade': 'mg/m3', 'duracao': 240},
+    ])
+
+    assert resultados[0]['unidade'] == 'ppm'
+    assert resultados[0]['intensidade'] == pytest.approx(81.9)
+    assert resultados[0]['eh_especial'] is True
+
+
+@pytest.mark.parametrize('pico, especial', [(120.0, True), (110.0, False)])
+def test_fator_de_desvio(pico, especial):
+    # Limite de 78 ppm: fator de desvio 1,5, valor máximo de 117 ppm
+    resultados = _avaliar([
+        {'substancia': 'Tolueno', 'concentracao': pico, 'duracao': 15},
+        {'substancia': 'Tolueno', 'concentracao': 10.0, 'duracao': 465},
+    ])
+
+    assert resultados[0]['intensidade'] < 78.0
+    assert resultados[0]['detalhes']['excede_valor_maximo'] is especial
+    assert resultados[0]['eh_especial'] is especial
+
+
+@pytest.mark.parametrize('pico, especial', [(7.0, True), (3.9, False)])
+def test_valor_teto(pico, especial):
+    resultados = _avaliar([
+        {'substancia': 'Ácido clorídrico', 'concentracao': pico, 'duracao': 15},
+        {'substancia': 'Ácido clorídrico', 'concentracao': 0.0, 'duracao': 465},
+    ])
+
+    assert resultados[0]['detalhes']['valor_teto'] is True
+    assert resultados[0]['eh_especial'] is especial
+
+
+def test_substancia_nao_catalogada():
+    resultados = agentes_quimicos.processar_periodo(INICIO, FIM, 10.0, 'Manganês', 'mg/m3')
+
+    assert resultados[0]['eh_especial'] is False
+    assert resultados[0]['detalhes']['criterio'] == 'nao_catalogado'
+    assert 'limite' not in resultados[0]
+
+
+def test_avaliar_periodo_com_unidade():
+    assert agentes_quimicos.avaliar_periodo(INICIO, FIM, ['Mercúrio'], 0.05, 'mg/m3') is True
+    assert agentes_quimicos.avaliar_periodo(INICIO, FIM, ['Manganês'], 0.05) is False
+    with pytest.raises(ValueError):
+        agentes_quimicos.avaliar_periodo(INICIO, FIM, ['Mercúrio'], 0.05)
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from agentes import calor
+
+
+def _periodo(ibutg, metabolismo=calor.METABOLISMO_PADRAO):
+    # Com tbn = tg, o IBUTG sem carga solar é igual à temperatura informada
+    ibutg = np.asarray(ibutg, dtype=float)
+    return {
+        'data_inicio': datetime(1995, 1, 1),
+        'data_fim': datetime(2021, 1, 1),
+        'tbn': ibutg,
+        'tg': ibutg,
+        'metabolismo': metabolismo,
+    }
+
+
+def test_limites_por_regime():
+    assert calor.limite_ibutg(0, 200.0) == 28.0
+    assert calor.limite_ibutg(1, 500 * calor.KCAL_H_PARA_W) == 25.0
+    assert calor.limite_ibutg(1, 300 * calor.KCAL_H_PARA_W) == 27.5
+    assert calor.limite_ibutg(2, calor.METABOLISMO_PADRAO) == 20.9
+
+
+def test_janela_movel_alcanca_calor_que_atravessa_a_hora_cheia():
+    ibutg = np.full(180, 20.0)
+    ibutg[30:90] = 32.0
+
+    resultados = calor.processar_medicoes([_periodo(ibutg)])[0]
+
+    assert [r['intensidade'] for r in resultados] == [32.0, 32.0, 32.0]
+    assert all(r['eh_especial'] for r in resultados)
+
+
+def test_pico_final_nao_e_tratado_como_hora_inteira():
+    ibutg = np.append(np.full(120, 20.0), 40.0)
+
+    resultados = calor.processar_medicoes([_periodo(ibutg)])[0]
+
+    assert [r['intensidade'] for r in resultados] == [20.3, 20.3, 20.3]
+    assert not any(r['eh_especial'] for r in resultados)
+
+
+def test_janela_critica_escolhida_pelo_limite_de_cada_regime():
+    # Primeira hora: IBUTG mais alto com atividade leve; última hora: IBUTG
+    # menor com atividade pesada, crítica quando o limite depende da taxa metabólica
+    ibutg = np.concatenate([np.full(60, 27.5), np.full(60, 20.0), np.full(60, 25.0)])
+    metabolismo = np.concatenate([np.full(120, 200.0), np.full(60, 600.0)])
+
+    resultados = calor.processar_medicoes([_periodo(ibutg, metabolismo)])[0]
+
+    assert resultados[0]['intensidade'] == 27.5
+    assert resultados[0]['eh_especial'] is False
+    assert resultados[2]['intensidade'] == 25.0
+    assert resultados[2]['detalhes']['metabolismo'] == 600.0
+    assert resultados[2]['eh_especial'] is True
+
+
+def test_conjunto_com_menos_de_60_minutos():
+    with pytest.raises(ValueError):
+        calor.calcular_ibutg_janelas([_periodo(np.full(59, 30.0))])
+
+
+def test_taxa_metabolica_nao_positiva():
+    with pytest.raises(ValueError):
+        calor.processar_periodo(datetime(2020, 1, 1), datetime(2021, 1, 1), 26.0, 0.0)
+    with pytest.raises(ValueError):
+        calor.calcular_ibutg_janelas([_periodo(np.full(60, 30.0), 0.0)])
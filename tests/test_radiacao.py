@@ -0,0 +1,28 @@
+from datetime import date, datetime
+
+from agentes import radiacao
+
+
+def test_dose_de_regime_anterior_nao_torna_especial_subperiodo_sem_dose():
+    # 2,5 mSv/mês de 2000 a 2004 e nenhuma dose a partir de 2005
+    registros = [
+        {'data': date(ano, mes, 1), 'dose': 2.5}
+        for ano in range(2000, 2005) for mes in range(1, 13)
+    ]
+
+    resultados = radiacao.processar_periodo(
+        datetime(2000, 1, 1), datetime(2008, 12, 31), 1.0, registros=registros
+    )
+
+    assert [r['data_inicio'] for r in resultados] == ['01/01/2000', '06/01/2005']
+    assert resultados[1]['eh_especial'] is False
+    assert resultados[1]['intensidade'] == 0.0
+    assert resultados[1]['detalhes']['janelas_excedidas'] == []
+
+
+def test_janela_quinquenal_dentro_do_subperiodo_acima_do_limite():
+    resultados = radiacao.processar_periodo(datetime(2005, 1, 6), datetime(2010, 12, 31), 30.0)
+
+    assert resultados[0]['eh_especial'] is True
+    assert resultados[0]['limite'] == 100.0
+    assert resultados[0]['detalhes']['dose_quinquenal_maxima'] == 150.0